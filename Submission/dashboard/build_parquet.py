@@ -0,0 +1,14 @@
+# Membuat ulang cleaned-day.parquet dan cleaned-hour.parquet dari CSV.
+# Jalankan setiap kali file CSV atau data_prep.py berubah:
+#   python build_parquet.py
+import os
+import pandas as pd
+from data_prep import DTYPES_DAY, DTYPES_HOUR, read_csv_prepared
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+for name, dtype in [("day", DTYPES_DAY), ("hour", DTYPES_HOUR)]:
+    df = read_csv_prepared(os.path.join(BASE_DIR, f"cleaned-{name}.csv"), dtype)
+    out_path = os.path.join(BASE_DIR, f"cleaned-{name}.parquet")
+    df.to_parquet(out_path, compression='zstd', index=False)
+    print(f"{out_path}: {len(df)} baris")
@@ -1,7 +1,14 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # render tanpa GUI, tidak perlu mendeteksi backend saat startup
+from matplotlib.figure import Figure
 import seaborn as sns
+import altair as alt
+from data_prep import MONTHS, SEASONS, WEATHERS, DTYPES_DAY, DTYPES_HOUR, read_csv_prepared
 
 # ==============================================
 # KONFIGURASI PAGE
@@ -11,44 +18,130 @@ st.set_page_config(page_title="Analisis Penyewaan Sepeda", layout="wide", page_i
 # ==============================================
 # KONFIGURASI DATA
 # ==============================================
-month_map = {
-    1: 'January', 2: 'February', 3: 'March', 4: 'April',
-    5: 'May', 6: 'June', 7: 'July', 8: 'August',
-    9: 'September', 10: 'October', 11: 'November', 12: 'December'
-}
-
-weather_map = {
-    1: 'Clear/Partly Cloudy',
-    2: 'Mist/Cloudy',
-    3: 'Light Rain/Snow/Thunderstorm',
-    4: 'Heavy Rain/Snow/Fog'
-}
-
-season_map = {
-    1: 'Winter', 2: 'Spring', 3: 'Summer', 4: 'Fall'
-}
+HOUR_DTYPE = pd.CategoricalDtype(range(24), ordered=True)
+
+# Warna tetap per kategori (bukan per posisi hasil filter), sehingga tiap
+# bulan/musim/cuaca selalu berwarna sama apa pun filternya
+MONTH_COLORS = sns.color_palette("Set2", len(MONTHS))
+SEASON_COLORS = sns.color_palette("Set2", len(SEASONS))
+WEATHER_COLORS = sns.color_palette("Set2", len(WEATHERS))
+
+CORR_COLS = ['temp', 'hum', 'windspeed', 'casual', 'registered', 'cnt']
+
+# Batas entri cache per fungsi (lihat get_filtered)
+FILTERED_CACHE_ENTRIES = 8
+AGG_CACHE_ENTRIES = 64
+
+DATA_DIR = "/mount/src/septiadibayu-submission/Submission/dashboard"
 
 # ==============================================
 # FUNGSI UTAMA
 # ==============================================
-@st.cache_data
+# cache_resource mengembalikan objek DataFrame yang sama (tanpa pickle/copy)
+# di setiap rerun dan sesi; DataFrame ini dipakai bersama sehingga hanya boleh
+# dibaca, jangan diubah di tempat (filter selalu menghasilkan DataFrame baru)
+@st.cache_resource
 def load_data():
     try:
-        day_df = pd.read_csv("/mount/src/septiadibayu-submission/Submission/dashboard/cleaned-day.csv")
-        hour_df = pd.read_csv("/mount/src/septiadibayu-submission/Submission/dashboard/cleaned-hour.csv")
-        
-        # Proses data sesuai notebook
-        for df in [day_df, hour_df]:
-            df['dteday'] = pd.to_datetime(df['dteday'])
-            df['mnth_name'] = df['mnth'].map(month_map)
-            df['season_name'] = df['season'].map(season_map)
-            df['weather_desc'] = df['weathersit'].map(weather_map)
-            
+        # File parquet berisi hasil prepare_data (tipe data & kolom turunan
+        # sudah jadi) dan dibuat ulang dengan build_parquet.py setiap kali CSV
+        # atau data_prep.py berubah; CSV hanya dipakai jika parquet tidak ada
+        day_parquet = os.path.join(DATA_DIR, "cleaned-day.parquet")
+        hour_parquet = os.path.join(DATA_DIR, "cleaned-hour.parquet")
+        # Kedua file dibaca paralel; parser pandas/pyarrow melepas GIL
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            if os.path.exists(day_parquet) and os.path.exists(hour_parquet):
+                day_fut = ex.submit(pd.read_parquet, day_parquet)
+                hour_fut = ex.submit(pd.read_parquet, hour_parquet)
+            else:
+                day_fut = ex.submit(read_csv_prepared, os.path.join(DATA_DIR, "cleaned-day.csv"), DTYPES_DAY)
+                hour_fut = ex.submit(read_csv_prepared, os.path.join(DATA_DIR, "cleaned-hour.csv"), DTYPES_HOUR)
+            day_df, hour_df = day_fut.result(), hour_fut.result()
+
+        # Parquet tidak menyimpan kategorikal berlabel integer, jadi jam
+        # dijadikan kategorikal terurut (0-23) setelah dimuat
+        hour_df['hr'] = pd.Categorical.from_codes(hour_df['hr'].to_numpy(), dtype=HOUR_DTYPE)
+
         return day_df, hour_df
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None, None
 
+def filter_data(df, start_date, end_date, seasons, weathers):
+    # df sudah terurut berdasarkan dteday, jadi rentang tanggal cukup dicari
+    # dengan searchsorted lalu dipotong, tanpa mask di seluruh baris
+    dates = df['dteday'].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(start_date, 'ns'), side='left')
+    hi = np.searchsorted(dates, np.datetime64(end_date, 'ns'), side='right')
+    df_slice = df.iloc[lo:hi]
+
+    season_col = df_slice['season_name'].cat
+    weather_col = df_slice['weather_desc'].cat
+    season_codes = season_col.categories.get_indexer(seasons)
+    weather_codes = weather_col.categories.get_indexer(weathers)
+
+    mask = np.logical_and.reduce([
+        np.isin(season_col.codes.to_numpy(), season_codes),
+        np.isin(weather_col.codes.to_numpy(), weather_codes)
+    ])
+    return df_slice.iloc[mask]
+
+# Hasil filter dan agregasi di-cache berdasarkan nilai filter, sehingga
+# rerun tanpa perubahan filter tidak menghitung ulang groupby/corr.
+# Jumlah entri dibatasi: kombinasi filter hampir tak terbatas, dan setiap
+# entri get_filtered menyimpan salinan kedua DataFrame hasil filter (~1 MB)
+@st.cache_data(max_entries=FILTERED_CACHE_ENTRIES)
+def get_filtered(start_date, end_date, seasons, weathers):
+    day_df, hour_df = load_data()
+    return (
+        filter_data(day_df, start_date, end_date, seasons, weathers),
+        filter_data(hour_df, start_date, end_date, seasons, weathers)
+    )
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def corr_day(start_date, end_date, seasons, weathers):
+    filtered_day, _ = get_filtered(start_date, end_date, seasons, weathers)
+    # np.corrcoef menghitung seluruh matriks sekaligus dari satu ndarray
+    # (data bersih, tidak perlu penanganan NaN seperti DataFrame.corr)
+    return np.corrcoef(filtered_day[CORR_COLS].to_numpy(dtype=np.float64), rowvar=False)
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def monthly_mean(start_date, end_date, seasons, weathers):
+    filtered_day, _ = get_filtered(start_date, end_date, seasons, weathers)
+    return filtered_day.groupby('mnth_name', observed=True)['cnt'].mean()
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def seasonal_mean(start_date, end_date, seasons, weathers):
+    filtered_day, _ = get_filtered(start_date, end_date, seasons, weathers)
+    return filtered_day.groupby('season_name', observed=True)['cnt'].mean()
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def daily_sum(start_date, end_date, seasons, weathers):
+    filtered_day, _ = get_filtered(start_date, end_date, seasons, weathers)
+    # Data sudah terurut per tanggal, jadi kunci tidak perlu diurutkan ulang
+    return filtered_day.groupby('dteday', sort=False)['cnt'].sum()
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def hourly_mean(start_date, end_date, seasons, weathers):
+    _, filtered_hour = get_filtered(start_date, end_date, seasons, weathers)
+    return filtered_hour.groupby('hr', observed=True)['cnt'].mean()
+
+@st.cache_data(max_entries=AGG_CACHE_ENTRIES)
+def weather_mean(start_date, end_date, seasons, weathers):
+    # Satu groupby untuk kedua panel cuaca (terdaftar & kasual)
+    _, filtered_hour = get_filtered(start_date, end_date, seasons, weathers)
+    return filtered_hour.groupby('weather_desc', observed=True)[['registered', 'casual']].mean()
+
+def get_fig(key, figsize, nrows=1, ncols=1):
+    # Figure disimpan per sesi dan dipakai ulang setiap rerun; dibuat lewat
+    # Figure() (bukan pyplot) sehingga tidak menumpuk di state global pyplot
+    figs = st.session_state.setdefault('_figs', {})
+    if key not in figs:
+        figs[key] = Figure(figsize=figsize)
+    fig = figs[key]
+    fig.clear()
+    return fig, fig.subplots(nrows, ncols)
+
 # ==============================================
 # KONFIGURASI STREAMLIT
 # ==============================================
@@ -70,39 +163,38 @@ with st.sidebar:
         "Rentang Tanggal",
         value=[min_date, max_date],
         min_value=min_date,
-        max_value=max_date
+        max_value=max_date,
+        key="filter_dates"
     )
     
     # Season Filter
-    seasons = ['Winter', 'Spring', 'Summer', 'Fall']
     selected_seasons = st.multiselect(
         "Musim",
-        options=seasons,
-        default=seasons
+        options=SEASONS,
+        default=SEASONS,
+        key="filter_seasons"
     )
     
     # Weather Filter
     selected_weather = st.multiselect(
         "Kondisi Cuaca",
-        options=list(weather_map.values()),
-        default=list(weather_map.values())
+        options=WEATHERS,
+        default=WEATHERS,
+        key="filter_weather"
     )
 
 # ==============================================
 # FILTER DATA
 # ==============================================
-filtered_day = day_df[
-    (day_df['dteday'].dt.date >= selected_dates[0]) &
-    (day_df['dteday'].dt.date <= selected_dates[1]) &
-    (day_df['season_name'].isin(selected_seasons)) &
-    (day_df['weather_desc'].isin(selected_weather))
-]
-filtered_hour = hour_df[
-    (hour_df['dteday'].dt.date >= selected_dates[0]) &
-    (hour_df['dteday'].dt.date <= selected_dates[1]) &
-    (hour_df['season_name'].isin(selected_seasons)) &
-    (hour_df['weather_desc'].isin(selected_weather))
-]
+# Urutan pilihan multiselect tidak memengaruhi hasil, jadi diurutkan agar
+# kunci cache tetap sama
+filter_key = (
+    selected_dates[0],
+    selected_dates[1],
+    tuple(sorted(selected_seasons)),
+    tuple(sorted(selected_weather))
+)
+filtered_day, filtered_hour = get_filtered(*filter_key)
 
 if filtered_day.empty or filtered_hour.empty:
     st.warning("📭 Tidak ada data yang sesuai dengan filter")
@@ -161,15 +253,18 @@ st.header("1. Analisis Korelasi")
 col1, col2 = st.columns(2)
 
 with col1:
-    fig, ax = plt.subplots(figsize=(10,6))
+    fig, ax = get_fig('corr_day', (10,6))
     sns.heatmap(
-        filtered_day[['temp', 'hum', 'windspeed', 'casual', 'registered', 'cnt']].corr(),
+        corr_day(*filter_key),
+        xticklabels=CORR_COLS,
+        yticklabels=CORR_COLS,
         annot=True, 
         cmap="coolwarm",
         fmt=".2f",
-        linewidths=0.5
+        linewidths=0.5,
+        ax=ax
     )
-    plt.title("Korelasi Antar Variabel dalam Dataset Day")
+    ax.set_title("Korelasi Antar Variabel dalam Dataset Day")
     st.pyplot(fig)
 
 # ==============================================
@@ -178,98 +273,84 @@ with col1:
 st.header("2. Analisis Temporal")
 
 # Panel 2.1: Bulanan
-fig, ax = plt.subplots(figsize=(8,6))
-monthly = filtered_day.groupby('mnth_name')['cnt'].mean().reset_index()
-sns.barplot(
-    x='mnth_name',
-    y='cnt',
-    data=monthly,
-    order=list(month_map.values()),
-    palette="Set2"
+fig, ax = get_fig('monthly', (8,6))
+monthly = monthly_mean(*filter_key)
+ax.bar(
+    monthly.index.astype(str),
+    monthly.values,
+    color=[MONTH_COLORS[c] for c in monthly.index.codes]
 )
-plt.title("Rata-rata Penyewaan Berdasarkan Bulan")
-plt.xlabel("Bulan")
-plt.ylabel("Rata-rata Penyewaan Sepeda")
-plt.xticks(rotation=45)
+ax.set_title("Rata-rata Penyewaan Berdasarkan Bulan")
+ax.set_xlabel("Bulan")
+ax.set_ylabel("Rata-rata Penyewaan Sepeda")
+ax.tick_params(axis='x', rotation=45)
 st.pyplot(fig)
 
 # Panel 2.2: Musiman
-fig, ax = plt.subplots(figsize=(8,6))
-seasonal = filtered_day.groupby('season_name')['cnt'].mean().reset_index()
-sns.barplot(
-    x='season_name',
-    y='cnt',
-    data=seasonal,
-    order=['Winter', 'Spring', 'Summer', 'Fall'],
-    palette="Set2"
+fig, ax = get_fig('seasonal', (8,6))
+seasonal = seasonal_mean(*filter_key)
+ax.bar(
+    seasonal.index.astype(str),
+    seasonal.values,
+    color=[SEASON_COLORS[c] for c in seasonal.index.codes]
 )
-plt.title("Rata-rata Penyewaan Berdasarkan Musim")
-plt.xlabel("Musim")
-plt.ylabel("Rata-rata Penyewaan Sepeda")
+ax.set_title("Rata-rata Penyewaan Berdasarkan Musim")
+ax.set_xlabel("Musim")
+ax.set_ylabel("Rata-rata Penyewaan Sepeda")
 st.pyplot(fig)
 
 # Panel 2.3: Per Jam dan harian
-fig, ax = plt.subplots(figsize=(12,6))
-daily_rentals = filtered_day.groupby('dteday')['cnt'].sum()
-
-ax.plot(
-    daily_rentals.index,
-    daily_rentals.values,
+# Grafik garis dirender di browser (Vega-Lite) dari data agregat,
+# tanpa rasterisasi PNG di server
+daily_rentals = daily_sum(*filter_key).reset_index()
+daily_chart = alt.Chart(daily_rentals).mark_line(
     color='green',
-    linewidth=2,
-    marker='o'
+    strokeWidth=2,
+    point=True
+).encode(
+    x=alt.X('dteday:T', title="Tanggal"),
+    y=alt.Y('cnt:Q', title="Total Penyewaan Sepeda"),
+    tooltip=[alt.Tooltip('dteday:T', title="Tanggal"), alt.Tooltip('cnt:Q', title="Total")]
+).properties(
+    title="Trend Penyewaan Harian",
+    height=450
 )
+st.altair_chart(daily_chart, use_container_width=True)
 
-ax.set_title("Trend Penyewaan Harian", fontsize=16)
-ax.set_xlabel("Tanggal", fontsize=12)
-ax.set_ylabel("Total Penyewaan Sepeda", fontsize=12)
-ax.grid(True, linestyle='--', alpha=0.6)
-plt.xticks(rotation=45)
-st.pyplot(fig)
-
-fig, ax = plt.subplots(figsize=(8,6))
-hourly = filtered_hour.groupby('hr')['cnt'].mean()
-plt.plot(
-    hourly.index,
-    hourly.values,
-    marker='o',
+hourly = hourly_mean(*filter_key).reset_index()
+hourly_chart = alt.Chart(hourly).mark_line(
     color='orange',
-    linewidth=2
+    strokeWidth=2,
+    point=True
+).encode(
+    x=alt.X('hr:O', title="Jam"),
+    y=alt.Y('cnt:Q', title="Rata-rata Penyewaan Sepeda"),
+    tooltip=[alt.Tooltip('hr:O', title="Jam"), alt.Tooltip('cnt:Q', title="Rata-rata", format=",.1f")]
+).properties(
+    title="Penyewaan Sepeda Per Jam",
+    height=450
 )
-plt.title("Penyewaan Sepeda Per Jam")
-plt.xlabel("Jam")
-plt.ylabel("Rata-rata Penyewaan Sepeda")
-plt.grid(True, linestyle='--', alpha=0.6)
-st.pyplot(fig)
+st.altair_chart(hourly_chart, use_container_width=True)
 
 # ==============================================
 # VISUALISASI 3: PENGARUH CUACA
 # ==============================================
 st.header("3. Pengaruh Kondisi Cuaca")
 
-fig, axes = plt.subplots(1, 2, figsize=(18,6))
+fig, axes = get_fig('weather', (18,6), ncols=2)
+weather = weather_mean(*filter_key)
+weather_labels = weather.index.astype(str)
+weather_colors = [WEATHER_COLORS[c] for c in weather.index.codes]
 
 # Panel 3.1: Pengguna Terdaftar
-sns.barplot(
-    x='weather_desc',
-    y='registered',
-    data=filtered_hour,
-    palette="Set2",
-    ax=axes[0]
-)
+axes[0].bar(weather_labels, weather['registered'].to_numpy(), color=weather_colors)
 axes[0].set_title("Pengaruh Cuaca terhadap Pengguna Terdaftar")
 axes[0].set_xlabel("Deskripsi Cuaca")
 axes[0].set_ylabel("Rata-rata Penyewaan Sepeda (Terdaftar)")
 axes[0].tick_params(axis='x', rotation=45)
 
 # Panel 3.2: Pengguna Kasual
-sns.barplot(
-    x='weather_desc',
-    y='casual',
-    data=filtered_hour,
-    palette="Set2",
-    ax=axes[1]
-)
+axes[1].bar(weather_labels, weather['casual'].to_numpy(), color=weather_colors)
 axes[1].set_title("Pengaruh Cuaca terhadap Pengguna Kasual")
 axes[1].set_xlabel("Deskripsi Cuaca")
 axes[1].set_ylabel("Rata-rata Penyewaan Sepeda (Kasual)")
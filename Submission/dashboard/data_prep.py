@@ -0,0 +1,53 @@
+import pandas as pd
+
+# ==============================================
+# KONFIGURASI DATA
+# ==============================================
+month_map = {
+    1: 'January', 2: 'February', 3: 'March', 4: 'April',
+    5: 'May', 6: 'June', 7: 'July', 8: 'August',
+    9: 'September', 10: 'October', 11: 'November', 12: 'December'
+}
+
+weather_map = {
+    1: 'Clear/Partly Cloudy',
+    2: 'Mist/Cloudy',
+    3: 'Light Rain/Snow/Thunderstorm',
+    4: 'Heavy Rain/Snow/Fog'
+}
+
+season_map = {
+    1: 'Winter', 2: 'Spring', 3: 'Summer', 4: 'Fall'
+}
+
+# Urutan label dihitung sekali saat modul dimuat, bukan setiap rerun
+MONTHS = list(month_map.values())
+SEASONS = list(season_map.values())
+WEATHERS = list(weather_map.values())
+
+# Tipe data ringkas: kolom cuaca ternormalisasi [0,1], kode kategori kecil
+DTYPES_DAY = {
+    'season': 'int8', 'yr': 'int8', 'mnth': 'int8', 'holiday': 'int8',
+    'weekday': 'int8', 'workingday': 'int8', 'weathersit': 'int8',
+    'temp': 'float32', 'atemp': 'float32', 'hum': 'float32', 'windspeed': 'float32',
+    'casual': 'int32', 'registered': 'int32', 'cnt': 'int32'
+}
+DTYPES_HOUR = {**DTYPES_DAY, 'hr': 'int8'}
+
+# ==============================================
+# PERSIAPAN DATA
+# ==============================================
+def prepare_data(df):
+    # Proses data sesuai notebook
+    df['dteday'] = pd.to_datetime(df['dteday'])
+    # Kode 1..n langsung menjadi kategorikal (kode - 1) tanpa lookup per baris;
+    # filter cukup membandingkan kode integer, bukan string
+    df['mnth_name'] = pd.Categorical.from_codes(df['mnth'].to_numpy() - 1, categories=MONTHS, ordered=True)
+    df['season_name'] = pd.Categorical.from_codes(df['season'].to_numpy() - 1, categories=SEASONS, ordered=True)
+    df['weather_desc'] = pd.Categorical.from_codes(df['weathersit'].to_numpy() - 1, categories=WEATHERS)
+
+    # Urutkan berdasarkan tanggal agar bisa dipotong dengan searchsorted
+    return df.sort_values('dteday', kind='stable').reset_index(drop=True)
+
+def read_csv_prepared(path, dtype):
+    return prepare_data(pd.read_csv(path, dtype=dtype))